@@ -1,6 +1,5 @@
 import csv
 import json
-import yaml
 import argparse
 import sys
 
@@ -17,11 +16,18 @@ def get_device_data(inventory, device_name):
             return device  
     return None  
 
+def build_device_index(inventory):
+    device_index = {}
+    for device in inventory:
+        device_index.setdefault(device["Name"], device)  # first match wins, like get_device_data
+    return device_index
+
 def format_inventory_json(inventory_data):    
     inventory_json = json.dumps(inventory_data, indent = 4)
     return inventory_json 
 
 def format_inventory_yaml(inventory_data):
+    import yaml  # imported lazily; only YAML output needs it
     inventory_yaml = yaml.dump(inventory_data, indent = 4)
     return inventory_yaml
 
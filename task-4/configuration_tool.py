@@ -10,129 +10,331 @@ This tool allows you to:
 """
 
 # Imports for device connectivity and inventory management
-from inventory_tool import read_inventory, get_device_data
-from netmiko import ConnectHandler
-from jinja2 import Template
+from inventory_tool import read_inventory, build_device_index
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+import atexit
+import functools
+import logging
+import os
+import re
+import sys
+import threading
 import click
 
+log = logging.getLogger(__name__)
+
+# Live device sessions keyed by their ConnInfo, reused across calls
+_CONN_POOL = {}
+_CONN_POOL_LOCK = threading.Lock()
+
+# Connections left in configuration mode by send_config(exit_config_mode=False)
+_IN_CONFIG_MODE = set()
+
+# Upper bound on concurrent SSH sessions for bulk runs
+MAX_WORKERS = 20
+
+# Interface, IP-Address and Status columns of 'show ip interface brief'
+_IFACE_RE = re.compile(r"^[ \t]*(\S+)[ \t]+(\S+)[ \t]+\S+[ \t]+\S+[ \t]+(\S+)", re.M)
+
+@functools.lru_cache(maxsize=8)
+def _read_inventory_at(path, mtime):
+    """Parses the inventory file; mtime is only part of the cache key."""
+    inventory = read_inventory(path)
+    return inventory, build_device_index(inventory)
+
+def _load_inventory_cached(path):
+    """
+    Loads inventory data, re-parsing the file only when it has changed on disk.
+    
+    Args:
+        path (str): Path to the inventory CSV file
+        
+    Returns:
+        tuple: (inventory list, {device name: device data} index); both are
+               shared between callers and must not be modified
+    """
+    return _read_inventory_at(path, os.path.getmtime(path))
+
 # TASK 1: DEVICE CONNECTIVITY FUNCTIONS
 
-def get_conn_info(dev_data):
+@dataclass(slots=True, frozen=True)
+class ConnInfo:
+    """Immutable Netmiko connection parameters for a single device."""
+    host: str
+    username: str
+    password: str = field(repr=False)
+    device_type: str = "cisco_ios"
+    fast_cli: bool = True
+    global_delay_factor: float = 1
+
+    def to_kwargs(self):
+        """
+        Returns keyword arguments for Netmiko ConnectHandler.
+        
+        The enable secret is the login password.
+        """
+        return {
+            "device_type": self.device_type,
+            "host": self.host,
+            "username": self.username,
+            "password": self.password,
+            "secret": self.password,
+            "fast_cli": self.fast_cli,
+            "global_delay_factor": self.global_delay_factor,
+        }
+
+def get_conn_info(dev_data, fast_cli=True, global_delay_factor=1):
     """
     Converts inventory device data into Netmiko connection parameters.
     
     Args:
         dev_data (dict): Device data from inventory, expected to have keys
                         'Management IP', 'Username', and 'Password'.
+        fast_cli (bool): Let Netmiko shorten its prompt-read sleeps; suits
+                        responsive lab devices. Pass False for slow links.
+        global_delay_factor (float): Multiplier for Netmiko's internal delays;
+                        raise above 1 for high-latency (WAN) devices.
         
     Returns:
-        dict: Connection parameters formatted for Netmiko ConnectHandler
+        ConnInfo: Connection parameters for connect_device()
     """
-    return {
-        "device_type": "cisco_ios",
-        "host": dev_data["Management IP"],
-        "username": dev_data["Username"],
-        "password": dev_data["Password"],
-        "secret": dev_data["Password"],
-    }
+    # Interned so devices sharing lab credentials share one string object
+    return ConnInfo(
+        host=dev_data["Management IP"],
+        username=sys.intern(dev_data["Username"]),
+        password=sys.intern(dev_data["Password"]),
+        fast_cli=fast_cli,
+        global_delay_factor=global_delay_factor,
+    )
+
+def _require_conn_info(device):
+    """Rejects connection parameters that did not come from get_conn_info()."""
+    if not isinstance(device, ConnInfo):
+        raise TypeError(
+            f"expected ConnInfo from get_conn_info(), got {type(device).__name__}"
+        )
 
 def connect_device(device):
     """
     Establishes connection to a network device using Netmiko.
     
     Args:
-        device (dict): Connection parameters dictionary from get_conn_info(),
-                      containing device_type, host, username, password, and secret.
+        device (ConnInfo): Connection parameters from get_conn_info()
         
     Returns:
         ConnectHandler or None: Netmiko connection object ready for sending commands,
                                or None if connection fails.
+    
+    Raises:
+        TypeError: If device is not a ConnInfo (e.g. an old-style dict)
     """
+    _require_conn_info(device)
+    
+    # Imported on first use: netmiko pulls in paramiko and cryptography, which
+    # dominate startup for runs that never open a session (--help, bad names)
+    from netmiko import ConnectHandler
+    
     try:
-        conn = ConnectHandler(**device)
+        conn = ConnectHandler(**device.to_kwargs())
+        # enable() checks the prompt itself and returns early when already privileged
         conn.enable()
         return conn
     except Exception as e:
-        print(f"Error connecting to device {device.get('host')}: {e}")
+        log.warning("Error connecting to %s: %s", device.host, e)
         return None
 
+def get_or_create_connection(device):
+    """
+    Returns a pooled connection for the device, connecting only if needed.
+    
+    Args:
+        device (ConnInfo): Connection parameters from get_conn_info()
+        
+    Returns:
+        ConnectHandler or None: Live Netmiko connection object from the pool,
+                               or None if connection fails.
+    
+    Raises:
+        TypeError: If device is not a ConnInfo (e.g. an old-style dict)
+    """
+    _require_conn_info(device)
+    # Keyed on every parameter, so changed credentials or tuning get a new session
+    key = device
+    with _CONN_POOL_LOCK:
+        conn = _CONN_POOL.get(key)
+    if conn is not None:
+        if conn.is_alive():
+            return conn
+        with _CONN_POOL_LOCK:
+            if _CONN_POOL.get(key) is conn:
+                del _CONN_POOL[key]
+        _IN_CONFIG_MODE.discard(conn)
+    
+    # Connect outside the lock so other devices are not held up by the handshake
+    conn = connect_device(device)
+    if conn:
+        with _CONN_POOL_LOCK:
+            pooled = _CONN_POOL.setdefault(key, conn)
+        if pooled is not conn:
+            # Another thread connected to the same device first; keep its session
+            conn.disconnect()
+            conn = pooled
+    return conn
+
+def close_all_connections():
+    """Disconnects every pooled connection; registered to run at exit."""
+    with _CONN_POOL_LOCK:
+        connections = list(_CONN_POOL.values())
+        _CONN_POOL.clear()
+    _IN_CONFIG_MODE.clear()
+    for conn in connections:
+        try:
+            conn.disconnect()
+        except Exception:
+            pass
+
+atexit.register(close_all_connections)
+
+def _evict_connection(conn):
+    """Removes a connection in an unknown state from the pool and closes it."""
+    with _CONN_POOL_LOCK:
+        for key, pooled in list(_CONN_POOL.items()):
+            if pooled is conn:
+                del _CONN_POOL[key]
+    _IN_CONFIG_MODE.discard(conn)
+    try:
+        conn.disconnect()
+    except Exception:
+        pass
+
+def _as_connection(device):
+    """Accepts either connection parameters or a live connection object."""
+    if isinstance(device, ConnInfo):
+        return get_or_create_connection(device)
+    if isinstance(device, dict):
+        # Old-style connection info; reject it rather than treat it as a connection
+        _require_conn_info(device)
+    return device
+
+def _leave_config_mode(conn):
+    """Returns a connection held in configuration mode to privileged exec."""
+    if conn in _IN_CONFIG_MODE:
+        _IN_CONFIG_MODE.discard(conn)
+        conn.exit_config_mode()
+
 def send_command(connection, command):
     """
     Sends a show command to device and returns output.
     
     Args:
-        connection: Netmiko ConnectHandler object from connect_device()
+        connection: Netmiko ConnectHandler object from connect_device(), or
+                    connection parameters from get_conn_info()
         command (str): Show command to execute (e.g., 'show version', 'show ip route')
         
     Returns:
         str: Command output from device, or error message if no connection available
     """
+    connection = _as_connection(connection)
     if connection:
+        _leave_config_mode(connection)
         return connection.send_command(command)
     return "No connection available"
 
 
 # TASK 2: CONFIGURATION FUNCTIONS
 
-def send_config(device, commands):
+def send_config(device, commands, exit_config_mode=True):
     """
     Sends configuration commands to a network device.
     
+    Back-to-back pushes can pass exit_config_mode=False on all but the last
+    call; the session then stays in configuration mode and the following
+    calls skip 'configure terminal' and 'end'.
+    
     Args:
-        device (dict): Connection parameters for the device from get_conn_info()
-        commands (list): List of configuration command strings to execute
+        device: Connection parameters for the device from get_conn_info(),
+                or a live Netmiko connection object
+        commands (list or tuple): Configuration command strings to execute
+        exit_config_mode (bool): Leave configuration mode after sending
         
     Returns:
         str: Configuration output from device, or error message if failed
     """
-    conn = connect_device(device)
+    conn = _as_connection(device)
     if not conn:
         return "Connection failed; configuration not sent."
     
     try:
-        output = conn.send_config_set(commands)
+        output = conn.send_config_set(
+            commands,
+            enter_config_mode=conn not in _IN_CONFIG_MODE,
+            exit_config_mode=exit_config_mode,
+        )
+        if exit_config_mode:
+            _IN_CONFIG_MODE.discard(conn)
+        else:
+            _IN_CONFIG_MODE.add(conn)
     except Exception as e:
+        # The session may still sit at a (config)# prompt; don't hand it out again
+        _evict_connection(conn)
         output = f"Error sending configuration: {e}"
-    finally:
-        conn.disconnect()
     
     return output
 
+def run_batch(device, show_cmds, config_cmds):
+    """
+    Runs show commands and then configuration commands over a single session.
+    
+    Args:
+        device: Connection parameters for the device from get_conn_info(),
+                or a live Netmiko connection object
+        show_cmds (list): Show commands to execute, in order
+        config_cmds (list): Configuration command strings to send afterwards
+        
+    Returns:
+        tuple: (list of show command outputs, configuration output string)
+    """
+    conn = _as_connection(device)
+    if not conn:
+        return (["No connection available"] * len(show_cmds),
+                "Connection failed; configuration not sent.")
+    
+    show_outputs = [send_command(conn, command) for command in show_cmds]
+    config_output = send_config(conn, config_cmds) if config_cmds else ""
+    return show_outputs, config_output
+
+@functools.lru_cache(maxsize=2048)
 def render_interface_config(action, interface, ip_address, subnet_mask):
     """
-    Generates interface configuration using Jinja2 template.
+    Generates interface configuration commands for the given action.
+    
+    Results are memoized, so repeated provisioning of the same interface
+    settings skips formatting entirely.
     
     Args:
-        interface_name (str): Interface name (e.g., 'GigabitEthernet0/1')
+        action (str): 'create' to assign the address, anything else to remove it
+        interface (str): Interface name (e.g., 'GigabitEthernet0/1')
         ip_address (str): IP address to configure
         subnet_mask (str): Subnet mask for the interface
         
     Returns:
-        str: Rendered configuration commands as string
+        tuple: Configuration commands ready for send_config(); use list()
+               if a mutable copy is needed
     """
     if action == "create":
-        config_vars = {
-            "interface": interface,
-            "ip_address": ip_address,
-            "subnet": subnet_mask
-        }
-        template_string = """
-interface {{ interface }}
-ip address {{ ip_address }} {{ subnet }}
-no shutdown
-"""
-    else:  # delete action
-        config_vars = {"interface": interface}
-        template_string = """
-interface {{ interface }}
-no ip address
-shutdown
-"""
-    
-    # Render template and convert to command list
-    rendered_config = Template(template_string).render(**config_vars)
-    commands = [line.strip() for line in rendered_config.splitlines() if line.strip()]
-    return commands
+        return (
+            f"interface {interface}",
+            f"ip address {ip_address} {subnet_mask}",
+            "no shutdown",
+        )
+    # delete action
+    return (
+        f"interface {interface}",
+        "no ip address",
+        "shutdown",
+    )
 
 
 # TASK 3: Interface Status Functions
@@ -142,21 +344,21 @@ def get_interface_brief(device):
     Retrieves interface brief information from device.
     
     Args:
-        connection: Netmiko ConnectHandler object from connect_device()
+        device: Connection parameters for the device from get_conn_info(),
+                or a live Netmiko connection object
         
     Returns:
         str: Interface brief output from 'show ip interface brief' command
     """
-    conn = connect_device(device)
+    conn = _as_connection(device)
     if not conn:
         return "Connection failed; cannot retrieve interface brief."
     
     try:
+        _leave_config_mode(conn)
         output = conn.send_command("show ip interface brief")
     except Exception as e:
         output = f"Error retrieving interface brief: {e}"
-    finally:
-        conn.disconnect()
     
     return output
 
@@ -164,7 +366,11 @@ def get_interface_brief(device):
 
 # TASK 4: CLI INTERFACE FUNCTIONS
 
-@click.command()
+@click.command(epilog=(
+    "Run 'configuration_tool.py bulk --help' to send one command to several "
+    "devices in parallel. To address a device named 'bulk', put an option "
+    "first, e.g. 'configuration_tool.py --command \"show version\" bulk'."
+))
 @click.argument('device_name')
 @click.option('--command', help='Command to send to device')
 @click.option('--config', help='Configuration commands (comma-separated)')
@@ -179,8 +385,8 @@ def cli_main(device_name, command, config):
     """
     try:
         # Load inventory and get device data
-        inventory = read_inventory("inventory.csv")
-        device_data = get_device_data(inventory, device_name)
+        _, devices = _load_inventory_cached("inventory.csv")
+        device_data = devices.get(device_name)
         
         if not device_data:
             click.echo(f"Device {device_name} not found in inventory")
@@ -189,36 +395,130 @@ def cli_main(device_name, command, config):
         # Get connection info
         conn_info = get_conn_info(device_data)
         
-        # Handle command or configuration
-        if command:
-            # For commands, establish connection for interactive use
-            connection = connect_device(conn_info)
+        # Handle command and/or configuration
+        if command and config:
+            # Both requested: run them back to back on one session
+            connection = get_or_create_connection(conn_info)
+            if not connection:
+                click.echo(f"Failed to connect to {device_name}")
+                return
+            (output,), config_output = run_batch(connection, [command], config.split(','))
+            click.echo(f"Output from {device_name}:\n{output}\n"
+                       f"Configuration output from {device_name}:\n{config_output}")
+        elif command:
+            # For commands, reuse a pooled connection (closed at exit)
+            connection = get_or_create_connection(conn_info)
             if not connection:
                 click.echo(f"Failed to connect to {device_name}")
                 return
             output = send_command(connection, command)
-            click.echo(f"Output from {device_name}:")
-            click.echo(output)
-            connection.disconnect()
+            click.echo(f"Output from {device_name}:\n{output}")
         elif config:
-            # For configuration, let send_config handle connection management
+            # For configuration, send_config picks up the pooled connection
             config_commands = config.split(',')
             output = send_config(conn_info, config_commands)
-            click.echo(f"Configuration output from {device_name}:")
-            click.echo(output)
+            click.echo(f"Configuration output from {device_name}:\n{output}")
         else:
             click.echo("Please specify --command or --config option")
             
     except Exception as e:
         click.echo(f"Error: {e}")
 
+def send_command_on(devices, device_name, command):
+    """
+    Runs a show command on one inventory device, capturing any failure.
+    
+    Args:
+        devices (dict): Device index from build_device_index()
+        device_name (str): Name of device from inventory
+        command (str): Show command to execute
+        
+    Returns:
+        str: Command output, or an error message for this device only
+    """
+    try:
+        device_data = devices.get(device_name)
+        if not device_data:
+            return f"Device {device_name} not found in inventory"
+        
+        connection = get_or_create_connection(get_conn_info(device_data))
+        if not connection:
+            return f"Failed to connect to {device_name}"
+        return send_command(connection, command)
+    except Exception as e:
+        return f"Error: {e}"
+
+@click.command()
+@click.option('--devices', required=True, help='Device names from inventory (comma-separated)')
+@click.option('--command', required=True, help='Command to send to each device')
+@click.option('--workers', default=MAX_WORKERS, show_default=True,
+              help='Maximum number of devices handled concurrently')
+def cli_bulk(devices, command, workers):
+    """
+    Command-line interface for running one command on several devices in parallel.
+    
+    Args:
+        devices (str): Comma-separated device names from inventory
+        command (str): Show command to execute on every device
+        workers (int): Maximum number of concurrent device sessions
+    """
+    try:
+        _, inventory_index = _load_inventory_cached("inventory.csv")
+        device_names = list(dict.fromkeys(
+            name.strip() for name in devices.split(',') if name.strip()
+        ))
+        
+        # Names resolving to the same ConnInfo share one pooled session,
+        # which is not safe to drive from two threads; keep them in one worker
+        groups = {}
+        for name in device_names:
+            device_data = inventory_index.get(name)
+            key = get_conn_info(device_data) if device_data else name
+            groups.setdefault(key, []).append(name)
+        
+        def run_group(names):
+            return [(name, send_command_on(inventory_index, name, command)) for name in names]
+        
+        # SSH is I/O bound, so threads overlap the per-device handshakes
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            outputs = dict(
+                result for group in executor.map(run_group, groups.values()) for result in group
+            )
+        report = [f"Output from {name}:\n{outputs[name]}" for name in device_names]
+        
+        # Flush the whole report in one write once every device has finished
+        click.echo("\n".join(report))
+        
+    except Exception as e:
+        click.echo(f"Error: {e}")
+
+def setup_logging(filename="configuration_tool.log"):
+    """
+    Sends log records to a size-capped rotating file and echoes warnings
+    (e.g. why a connection failed) to stderr; called at CLI entry.
+    
+    Args:
+        filename (str): Path of the log file
+    """
+    # delay=True: the file is only created once something is actually logged
+    file_handler = RotatingFileHandler(filename, maxBytes=1_000_000, backupCount=3, delay=True)
+    file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setLevel(logging.WARNING)
+    console_handler.setFormatter(logging.Formatter("%(message)s"))
+    
+    # Root stays at WARNING so third-party INFO chatter (e.g. paramiko login
+    # messages) never reaches the file
+    logging.basicConfig(level=logging.WARNING, handlers=[file_handler, console_handler])
+
 def main():
     """Test the interface status display functionality."""
     try:
         # Load inventory data
-        inventory_data = read_inventory("inventory.csv")
+        inventory_data, devices = _load_inventory_cached("inventory.csv")
         print(f"Loaded {len(inventory_data)} devices from inventory")
-        R1_data = get_device_data(inventory_data, "R1")
+        R1_data = devices.get("R1")
         
         if R1_data:
             conn_info = get_conn_info(R1_data)
@@ -231,13 +531,10 @@ def main():
             
             # Parse and display formatted interface information
             print("Formatted Interface Status:")
-            for line in brief.splitlines()[1:]:  # Skip header line
-                parts = line.split()
-                if len(parts) >= 5:
-                    interface = parts[0]
-                    ip_address = parts[1]
-                    status = parts[4]
-                    print(f"Interface {interface}: IP: {ip_address}, Status: {status}")
+            body_start = brief.find("\n") + 1 or len(brief)  # Skip header line
+            for match in _IFACE_RE.finditer(brief, body_start):  # lazy, one row at a time
+                interface, ip_address, status = match.groups()
+                print(f"Interface {interface}: IP: {ip_address}, Status: {status}")
         else:
             print("Device R1 not found in inventory")
             
@@ -245,5 +542,10 @@ def main():
         print(f"Error: {e}")
 
 if __name__ == "__main__":
-    # Interactive CLI interface
-    cli_main()
\ No newline at end of file
+    setup_logging()
+    # Interactive CLI interface; a leading "bulk" selects the multi-device mode
+    # (documented in the cli_main --help epilog)
+    if len(sys.argv) > 1 and sys.argv[1] == "bulk":
+        cli_bulk(sys.argv[2:], prog_name=f"{os.path.basename(sys.argv[0])} bulk")
+    else:
+        cli_main()
\ No newline at end of file